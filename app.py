@@ -1,15 +1,37 @@
-from flask import Flask, request, jsonify, send_file
+from quart import Quart, Response, request, jsonify
+from quart.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import HTTPException
 from google import genai
 from google.genai import types
-import wave
+import httpx
+import struct
 import os
-import io
-import json
-import uuid
+import orjson
+import hashlib
+import functools
+import re
+import collections
+import secrets
 from datetime import datetime
 import logging
+import asyncio
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from cachetools import LRUCache
 
-app = Flask(__name__)
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app = Quart(__name__)
+app.json = ORJSONProvider(app)
 logging.basicConfig(level=logging.INFO)
 
 # Get API key from environment variable
@@ -17,57 +39,324 @@ GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY environment variable is not set")
 
-# Initialize the client
-client = genai.Client(api_key=GEMINI_API_KEY)
+# Initialize the client once per process. Its HTTP transports are kept
+# alive with a shared connection pool over HTTP/2, so concurrent calls
+# reuse connections instead of paying a TCP+TLS handshake each time.
+GEMINI_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+client = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=types.HttpOptions(
+        client_args={"http2": True, "limits": GEMINI_HTTP_LIMITS},
+        async_client_args={"http2": True, "limits": GEMINI_HTTP_LIMITS}
+    )
+)
 
 # Directory to save audio files (if saving to disk)
 AUDIO_OUTPUT_DIR = os.environ.get('AUDIO_OUTPUT_DIR', '/app/audio_output')
 os.makedirs(AUDIO_OUTPUT_DIR, exist_ok=True)
+# Files are created relative to a directory descriptor opened once, which
+# saves resolving the full directory path on every write
+AUDIO_OUTPUT_PREFIX = AUDIO_OUTPUT_DIR.rstrip(os.sep) + os.sep
+AUDIO_OUTPUT_DIR_FD = os.open(AUDIO_OUTPUT_DIR, os.O_RDONLY | os.O_DIRECTORY)
+
+# Maximum number of Gemini TTS calls in flight per worker process.
+# Tune to the Gemini quota tier to stay under the rate limits (HTTP 429).
+TTS_CONCURRENT_REQUESTS = int(os.environ.get('TTS_CONCURRENT_REQUESTS', 3))
+TTS_SEM = asyncio.Semaphore(TTS_CONCURRENT_REQUESTS)
+
+# In-process cache of synthesized PCM audio, bounded by total size in bytes
+TTS_CACHE_MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+audio_cache = LRUCache(maxsize=TTS_CACHE_MAX_BYTES, getsizeof=len)
+# Gemini calls in flight, keyed like the cache, so identical concurrent
+# requests are coalesced into a single call
+inflight_synthesis = {}
+
+# Audio parts buffered between the Gemini stream and a streamed response
+STREAM_QUEUE_MAX_PARTS = 256
+
+# Pool of bytearrays reused to assemble streamed audio, so long-running
+# workers do not allocate and free a multi-megabyte buffer per request.
+# The pool keeps one buffer per concurrent Gemini call and drops any
+# extras, so it pins at most TTS_CONCURRENT_REQUESTS * BUFFER_POOL_MAX_BYTES.
+BUFFER_POOL = queue.LifoQueue(maxsize=TTS_CONCURRENT_REQUESTS)
+BUFFER_POOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Optionally synthesize /tts/stream chunks in worker processes that are
+# replaced after a few tasks, so the memory held by large PCM buffers is
+# returned to the OS when they exit. Disabled when set to 0.
+TTS_STREAM_PROCESSES = int(os.environ.get('TTS_STREAM_PROCESSES', 0))
+TTS_PROCESS_MAX_TASKS = int(os.environ.get('TTS_PROCESS_MAX_TASKS', 4))
+process_pool = None
+process_pool_tasks = 0
+
+# Sentence boundaries used to split text for /tts/pipeline
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+# Sentences synthesized ahead of the client in /tts/pipeline, bounding both
+# the audio held in memory and the request's share of TTS_SEM
+TTS_PIPELINE_WINDOW = int(os.environ.get('TTS_PIPELINE_WINDOW', 2 * TTS_CONCURRENT_REQUESTS))
+
+# Canonical 44-byte PCM RIFF/WAVE header
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+WAV_HEADER_SIZE = WAV_HEADER.size
+# Placeholder data size for streamed audio whose length is not known up
+# front; it makes the RIFF size 0xFFFFFFFF, which players treat as "until EOF"
+WAV_STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+
+def wav_header(data_size, channels=1, rate=24000, sample_width=2):
+    """Build the RIFF/WAVE header for a PCM payload of data_size bytes"""
+    return WAV_HEADER.pack(
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, rate,
+        rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b"data", data_size
+    )
+
+async def stream_wave_file(pcm_data, channels=1, rate=24000, sample_width=2):
+    """Stream a wave file as its header followed by the untouched PCM data"""
+    yield wav_header(len(pcm_data), channels, rate, sample_width)
+    yield pcm_data
+
+def acquire_buffer():
+    """Take a reusable bytearray from the pool, or allocate a new one"""
+    try:
+        return BUFFER_POOL.get_nowait()
+    except queue.Empty:
+        return bytearray()
+
+def release_buffer(buffer):
+    """Return a bytearray to the pool, keeping its allocation for reuse"""
+    # The contents are overwritten by the next user, so the buffer is not
+    # cleared (bytearray.clear() would also give the memory back)
+    if len(buffer) > BUFFER_POOL_MAX_BYTES:
+        return
+    try:
+        BUFFER_POOL.put_nowait(buffer)
+    except queue.Full:
+        pass
+
+async def stream_gemini_audio(contents, config):
+    """
+    Yield PCM audio parts from Gemini as they are generated
+    
+    Gemini is read on its own task into a bounded queue, so a TTS_SEM slot
+    is held while Gemini produces audio rather than while the client
+    downloads it. Only a reader more than STREAM_QUEUE_MAX_PARTS parts
+    behind holds the slot past the end of generation.
+    """
+    parts = asyncio.Queue(maxsize=STREAM_QUEUE_MAX_PARTS)
+    
+    async def _read():
+        try:
+            async with TTS_SEM:
+                stream = await client.aio.models.generate_content_stream(
+                    model="gemini-2.5-flash-preview-tts",
+                    contents=contents,
+                    config=config
+                )
+                async for chunk in stream:
+                    if not chunk.candidates or not chunk.candidates[0].content:
+                        continue
+                    for part in chunk.candidates[0].content.parts or []:
+                        if part.inline_data and part.inline_data.data:
+                            await parts.put(part.inline_data.data)
+            await parts.put(None)
+        except Exception as e:
+            await parts.put(e)
+    
+    reader = asyncio.create_task(_read())
+    try:
+        while True:
+            part = await parts.get()
+            if part is None:
+                return
+            if isinstance(part, Exception):
+                raise part
+            yield part
+    finally:
+        reader.cancel()
+
+async def synthesize_coalesced(cache_key, contents, config):
+    """Synthesize audio once for all concurrent requests with the same cache key"""
+    entry = inflight_synthesis.get(cache_key)
+    if entry is None:
+        async def _synthesize():
+            async with TTS_SEM:
+                response = await client.aio.models.generate_content(
+                    model="gemini-2.5-flash-preview-tts",
+                    contents=contents,
+                    config=config
+                )
+            audio_data = response.candidates[0].content.parts[0].inline_data.data
+            if len(audio_data) <= audio_cache.maxsize:
+                audio_cache[cache_key] = audio_data
+            return audio_data
+        
+        entry = {"task": asyncio.create_task(_synthesize()), "waiters": 0}
+        inflight_synthesis[cache_key] = entry
+        
+        def _forget(_, entry=entry):
+            if inflight_synthesis.get(cache_key) is entry:
+                del inflight_synthesis[cache_key]
+        
+        entry["task"].add_done_callback(_forget)
+    
+    # Shield the shared task so one client disconnecting does not cancel
+    # the call for the others waiting on it, but cancel it once the last
+    # waiter is gone so abandoned requests stop using Gemini and TTS_SEM
+    entry["waiters"] += 1
+    try:
+        return await asyncio.shield(entry["task"])
+    finally:
+        entry["waiters"] -= 1
+        if entry["waiters"] == 0 and not entry["task"].done():
+            if inflight_synthesis.get(cache_key) is entry:
+                del inflight_synthesis[cache_key]
+            entry["task"].cancel()
 
-def create_wave_file(pcm_data, channels=1, rate=24000, sample_width=2):
-    """Create a wave file in memory from PCM data"""
-    buffer = io.BytesIO()
-    with wave.open(buffer, 'wb') as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(sample_width)
-        wf.setframerate(rate)
-        wf.writeframes(pcm_data)
-    buffer.seek(0)
-    return buffer
+def open_in_audio_dir(filename, flags):
+    """Opener creating files relative to the audio output directory"""
+    return os.open(filename, flags, 0o644, dir_fd=AUDIO_OUTPUT_DIR_FD)
 
 def save_wave_file(filename, pcm_data, channels=1, rate=24000, sample_width=2):
-    """Save PCM data to a wave file on disk"""
-    filepath = os.path.join(AUDIO_OUTPUT_DIR, filename)
-    with wave.open(filepath, "wb") as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(sample_width)
-        wf.setframerate(rate)
-        wf.writeframes(pcm_data)
-    return filepath
-
-def parse_speaker_configs(speakers_data):
-    """Parse speaker configuration from request data"""
-    speaker_configs = []
-    for speaker in speakers_data:
-        speaker_configs.append(
-            types.SpeakerVoiceConfig(
-                speaker=speaker['name'],
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                        voice_name=speaker['voice']
-                    )
+    """Save PCM data to a wave file on disk, returning its path and size"""
+    with open(filename, "wb", opener=open_in_audio_dir) as f:
+        f.write(wav_header(len(pcm_data), channels, rate, sample_width))
+        f.write(pcm_data)
+    return AUDIO_OUTPUT_PREFIX + filename, WAV_HEADER_SIZE + len(pcm_data)
+
+def get_process_pool():
+    """
+    Return the chunk synthesis process pool to submit one task to
+    
+    The pool is replaced after TTS_PROCESS_MAX_TASKS tasks per worker. The
+    old pool is shut down without waiting, letting its processes finish
+    their queued tasks and exit. ProcessPoolExecutor's max_tasks_per_child
+    is not used, as it can deadlock on CPython 3.11 with a full queue.
+    """
+    global process_pool, process_pool_tasks
+    if TTS_STREAM_PROCESSES <= 0:
+        return None
+    if process_pool is None or process_pool_tasks >= TTS_STREAM_PROCESSES * TTS_PROCESS_MAX_TASKS:
+        if process_pool is not None:
+            process_pool.shutdown(wait=False)
+        process_pool = ProcessPoolExecutor(
+            max_workers=TTS_STREAM_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        process_pool_tasks = 0
+    process_pool_tasks += 1
+    return process_pool
+
+def discard_process_pool(pool):
+    """Stop handing out a broken process pool, so the next task gets a new one"""
+    global process_pool, process_pool_tasks
+    if process_pool is pool:
+        process_pool = None
+        process_pool_tasks = 0
+    pool.shutdown(wait=False)
+
+def synthesize_chunk_to_file(chunk, speakers_data, filename):
+    """Synthesize one chunk and save it to disk, for use in a worker process"""
+    try:
+        response = client.models.generate_content(
+            model="gemini-2.5-flash-preview-tts",
+            contents=chunk,
+            config=build_generate_config(speakers_data)
+        )
+        audio_data = response.candidates[0].content.parts[0].inline_data.data
+        return save_wave_file(filename, audio_data)
+    except Exception as e:
+        # google-genai errors cannot be unpickled in the parent, which would
+        # mark the whole pool as broken, so send back a plain error instead
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def split_sentences(text, speakers_data):
+    """
+    Split text into sentences for separate synthesis
+    
+    For multi-speaker text, each sentence keeps the "Name:" label of the
+    speaker turn it belongs to, so Gemini can still tell who is speaking.
+    """
+    if len(speakers_data) < 2:
+        return [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+    
+    names = "|".join(re.escape(speaker['name']) for speaker in speakers_data)
+    turn_label = re.compile(rf'^({names})\s*:\s*')
+    
+    sentences = []
+    speaker = None
+    for line in text.splitlines():
+        line = line.strip()
+        match = turn_label.match(line)
+        if match:
+            speaker = match.group(1)
+            line = line[match.end():]
+        for sentence in SENTENCE_BOUNDARY.split(line):
+            if sentence:
+                sentences.append(f"{speaker}: {sentence}" if speaker else sentence)
+    return sentences
+
+def audio_cache_key(text, speakers):
+    """Build a content-addressed cache key from the text and speakers config"""
+    payload = orjson.dumps({"t": text, "s": speakers}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def build_voice_config(voice_name):
+    """Build the config for a prebuilt voice"""
+    return types.VoiceConfig(
+        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+            voice_name=voice_name
+        )
+    )
+
+@functools.lru_cache(maxsize=256)
+def build_speech_config(voices):
+    """Build the speech config for a tuple of (speaker name, voice name) pairs"""
+    # A single speaker needs no speaker mapping, just the voice
+    if len(voices) == 1:
+        return types.SpeechConfig(voice_config=build_voice_config(voices[0][1]))
+    
+    return types.SpeechConfig(
+        multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
+            speaker_voice_configs=[
+                types.SpeakerVoiceConfig(
+                    speaker=name,
+                    voice_config=build_voice_config(voice)
                 )
-            )
+                for name, voice in voices
+            ]
         )
-    return speaker_configs
+    )
+
+def build_generate_config(speakers_data):
+    """Build the audio generation config, adding speaker voices if provided"""
+    config_params = {
+        "response_modalities": ["AUDIO"]
+    }
+    
+    if speakers_data:
+        # Speech configs are memoized, as the same voices recur across requests
+        voices = tuple((speaker['name'], speaker['voice']) for speaker in speakers_data)
+        config_params["speech_config"] = build_speech_config(voices)
+    
+    return types.GenerateContentConfig(**config_params)
+
+# Constant response bodies, serialized once at import
+HEALTH_RESPONSE = orjson.dumps({"status": "healthy", "service": "TTS API"})
+
+# Common Google TTS voices
+VOICES_RESPONSE = orjson.dumps({"available_voices": [
+    "Kore", "Puck", "Charon", "Krypton", "Fenrir",
+    "Aoede", "Orpheus", "Pegasus", "Sage", "Tamara"
+]})
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "TTS API"})
+    return Response(HEALTH_RESPONSE, mimetype='application/json')
 
 @app.route('/tts', methods=['POST'])
-def text_to_speech():
+async def text_to_speech():
     """
     Convert text to speech
     
@@ -79,11 +368,12 @@ def text_to_speech():
             {"name": "Speaker2", "voice": "Puck"}
         ],
         "save_to_disk": false,  # Optional, default false
-        "filename": "custom_name.wav"  # Optional
+        "filename": "custom_name.wav",  # Optional
+        "stream": false  # Optional, stream audio as Gemini produces it
     }
     """
     try:
-        data = request.get_json()
+        data = await request.get_json()
         
         if not data or 'text' not in data:
             return jsonify({"error": "Missing 'text' in request body"}), 400
@@ -92,30 +382,76 @@ def text_to_speech():
         speakers = data.get('speakers', [])
         save_to_disk = data.get('save_to_disk', False)
         custom_filename = data.get('filename', None)
+        stream = data.get('stream', False)
         
-        # Prepare the configuration
-        config_params = {
-            "response_modalities": ["AUDIO"]
-        }
-        
-        # Add multi-speaker configuration if speakers are provided
-        if speakers:
-            speaker_configs = parse_speaker_configs(speakers)
-            config_params["speech_config"] = types.SpeechConfig(
-                multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
-                    speaker_voice_configs=speaker_configs
-                )
-            )
+        # Files are only written inside the audio output directory
+        if save_to_disk and custom_filename is not None and (
+            not isinstance(custom_filename, str)
+            or '\0' in custom_filename
+            or os.path.basename(custom_filename) != custom_filename
+            or custom_filename in ('.', '..')
+        ):
+            return jsonify({"error": "'filename' must be a plain file name"}), 400
         
-        # Generate audio
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-tts",
-            contents=text,
-            config=types.GenerateContentConfig(**config_params)
-        )
+        # Serve identical text/voice combinations from the cache
+        cache_key = audio_cache_key(text, speakers)
+        audio_data = audio_cache.get(cache_key)
+        cache_hit = audio_data is not None
         
-        # Extract audio data
-        audio_data = response.candidates[0].content.parts[0].inline_data.data
+        if not cache_hit:
+            # Prepare the configuration
+            config = build_generate_config(speakers)
+            
+            if stream and not save_to_disk:
+                # Emit audio parts as they arrive to cut time to first byte.
+                # Wait for the first part here so that failures before any
+                # audio is produced are still reported as a JSON error.
+                audio_parts = stream_gemini_audio(text, config)
+                first_part = await anext(audio_parts, None)
+                if first_part is None:
+                    raise ValueError("Gemini returned no audio data")
+                
+                async def generate():
+                    # Assemble the audio for the cache in a pooled buffer
+                    pcm = acquire_buffer()
+                    size = 0
+                    try:
+                        yield wav_header(WAV_STREAMING_DATA_SIZE)
+                        pcm[0:len(first_part)] = first_part
+                        size = len(first_part)
+                        yield first_part
+                        try:
+                            async for part in audio_parts:
+                                pcm[size:size + len(part)] = part
+                                size += len(part)
+                                yield part
+                        except Exception as e:
+                            # Headers are already sent, so just end the stream
+                            logging.error(f"Error in TTS streaming: {str(e)}")
+                            return
+                        if size <= audio_cache.maxsize:
+                            with memoryview(pcm) as view:
+                                audio_cache[cache_key] = bytes(view[:size])
+                    finally:
+                        await audio_parts.aclose()
+                        release_buffer(pcm)
+                
+                response = Response(
+                    generate(),
+                    mimetype='audio/wav',
+                    headers={
+                        'Content-Disposition': 'attachment; filename=tts_output.wav',
+                        'X-Cache': 'MISS'
+                    }
+                )
+                # Long texts stream for longer than Quart's default response
+                # timeout, which would silently truncate the body
+                response.timeout = None
+                return response
+            
+            # Generate audio, sharing the Gemini call with any identical
+            # request already in flight
+            audio_data = await synthesize_coalesced(cache_key, text, config)
         
         if save_to_disk:
             # Save to disk and return file info
@@ -123,33 +459,39 @@ def text_to_speech():
                 filename = custom_filename
             else:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                unique_id = str(uuid.uuid4())[:8]
+                unique_id = secrets.token_hex(4)
                 filename = f"tts_{timestamp}_{unique_id}.wav"
             
-            filepath = save_wave_file(filename, audio_data)
+            filepath, size = await asyncio.to_thread(save_wave_file, filename, audio_data)
             
             return jsonify({
                 "message": "Audio saved successfully",
                 "filename": filename,
                 "path": filepath,
-                "size": os.path.getsize(filepath)
+                "size": size,
+                "cache_hit": cache_hit
             })
         else:
-            # Return the audio file directly
-            audio_buffer = create_wave_file(audio_data)
-            return send_file(
-                audio_buffer,
+            # Return the audio file directly, without copying it into a buffer
+            return Response(
+                stream_wave_file(audio_data),
                 mimetype='audio/wav',
-                as_attachment=True,
-                download_name='tts_output.wav'
+                headers={
+                    'Content-Disposition': 'attachment; filename=tts_output.wav',
+                    'Content-Length': str(WAV_HEADER_SIZE + len(audio_data)),
+                    'X-Cache': 'HIT' if cache_hit else 'MISS'
+                }
             )
             
+    except HTTPException as e:
+        # Raised by request.get_json() for malformed or non-JSON bodies
+        return jsonify({"error": e.description}), e.code
     except Exception as e:
         logging.error(f"Error in TTS processing: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/tts/stream', methods=['POST'])
-def text_to_speech_chunked():
+async def text_to_speech_chunked():
     """
     Process text in chunks for longer content
     
@@ -161,7 +503,7 @@ def text_to_speech_chunked():
     }
     """
     try:
-        data = request.get_json()
+        data = await request.get_json()
         
         if not data or 'chunks' not in data:
             return jsonify({"error": "Missing 'chunks' in request body"}), 400
@@ -172,38 +514,63 @@ def text_to_speech_chunked():
         
         audio_files = []
         
-        # Process each chunk
-        for i, chunk in enumerate(chunks):
-            config_params = {
-                "response_modalities": ["AUDIO"]
-            }
+        # Name every chunk of this request after one timestamp and random id,
+        # disambiguated by the chunk index
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        batch_id = f"{timestamp}_{secrets.token_hex(4)}"
+        
+        # The configuration is identical for every chunk, build it once
+        # and share it between the chunk tasks
+        config = build_generate_config(speakers)
+        
+        async def _synthesize(i, chunk):
+            filename = f"tts_chunk_{i}_{batch_id}.wav"
             
-            if speakers:
-                speaker_configs = parse_speaker_configs(speakers)
-                config_params["speech_config"] = types.SpeechConfig(
-                    multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
-                        speaker_voice_configs=speaker_configs
+            if TTS_STREAM_PROCESSES > 0:
+                # Synthesize and save in a worker process; only the file
+                # info comes back, the audio never crosses the process boundary
+                async with TTS_SEM:
+                    pool = get_process_pool()
+                    try:
+                        filepath, size = await asyncio.get_running_loop().run_in_executor(
+                            pool, synthesize_chunk_to_file, chunk, speakers, filename
+                        )
+                    except BrokenProcessPool:
+                        discard_process_pool(pool)
+                        raise
+            else:
+                async with TTS_SEM:
+                    response = await client.aio.models.generate_content(
+                        model="gemini-2.5-flash-preview-tts",
+                        contents=chunk,
+                        config=config
                     )
-                )
-            
-            response = client.models.generate_content(
-                model="gemini-2.5-flash-preview-tts",
-                contents=chunk,
-                config=types.GenerateContentConfig(**config_params)
-            )
+                audio_data = response.candidates[0].content.parts[0].inline_data.data
+                
+                # Write the file off the event loop, in parallel with other chunks
+                filepath, size = await asyncio.to_thread(save_wave_file, filename, audio_data)
             
-            audio_data = response.candidates[0].content.parts[0].inline_data.data
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"tts_chunk_{i}_{timestamp}.wav"
-            filepath = save_wave_file(filename, audio_data)
-            
-            audio_files.append({
+            return {
                 "chunk_index": i,
                 "filename": filename,
                 "path": filepath,
-                "size": os.path.getsize(filepath)
-            })
+                "size": size
+            }
+        
+        # Schedule every chunk up front so Gemini works on them in parallel
+        # (up to the semaphore cap), then collect them in submission order.
+        tasks = [
+            asyncio.create_task(_synthesize(i, chunk))
+            for i, chunk in enumerate(chunks)
+        ]
+        
+        for i, task in enumerate(tasks):
+            try:
+                audio_files.append(await task)
+            except Exception:
+                for pending in tasks[i + 1:]:
+                    pending.cancel()
+                raise
         
         return jsonify({
             "message": "All chunks processed successfully",
@@ -211,20 +578,119 @@ def text_to_speech_chunked():
             "total_chunks": len(chunks)
         })
         
+    except HTTPException as e:
+        # Raised by request.get_json() for malformed or non-JSON bodies
+        return jsonify({"error": e.description}), e.code
     except Exception as e:
         logging.error(f"Error in chunked TTS processing: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/tts/pipeline', methods=['POST'])
+async def text_to_speech_pipelined():
+    """
+    Stream speech for a long text, sentence by sentence
+    
+    The text is split into sentences that are synthesized concurrently, up
+    to TTS_PIPELINE_WINDOW ahead of what the client has read, and their
+    audio is streamed back in order as a single wave file, so playback can
+    start after the first sentence instead of the whole text.
+    
+    Request body:
+    {
+        "text": "First sentence. Second sentence! ...",
+        "speakers": [...]  # Optional
+    }
+    """
+    try:
+        data = await request.get_json()
+        
+        if not data or 'text' not in data:
+            return jsonify({"error": "Missing 'text' in request body"}), 400
+        
+        if not isinstance(data['text'], str):
+            return jsonify({"error": "'text' must be a string"}), 400
+        
+        speakers = data.get('speakers', [])
+        sentences = split_sentences(data['text'], speakers)
+        
+        if not sentences:
+            return jsonify({"error": "'text' is empty"}), 400
+        
+        config = build_generate_config(speakers)
+        
+        async def _synthesize(sentence):
+            cache_key = audio_cache_key(sentence, speakers)
+            audio_data = audio_cache.get(cache_key)
+            if audio_data is None:
+                audio_data = await synthesize_coalesced(cache_key, sentence, config)
+            return audio_data
+        
+        # Keep a bounded window of sentences in flight, starting the next
+        # one each time the oldest is handed to the client
+        remaining = iter(sentences)
+        window = collections.deque()
+        
+        def _fill_window():
+            while len(window) < TTS_PIPELINE_WINDOW:
+                sentence = next(remaining, None)
+                if sentence is None:
+                    return
+                window.append(asyncio.create_task(_synthesize(sentence)))
+        
+        _fill_window()
+        
+        # Wait for the first sentence here so that failures before any
+        # audio is produced are still reported as a JSON error
+        try:
+            first_audio = await window.popleft()
+        except Exception:
+            for pending in window:
+                pending.cancel()
+            raise
+        _fill_window()
+        
+        async def generate():
+            try:
+                yield wav_header(WAV_STREAMING_DATA_SIZE)
+                yield first_audio
+                while window:
+                    audio_data = await window.popleft()
+                    _fill_window()
+                    yield audio_data
+            except Exception as e:
+                # Headers are already sent, so just end the stream
+                logging.error(f"Error in pipelined TTS streaming: {str(e)}")
+            finally:
+                for pending in window:
+                    pending.cancel()
+        
+        response = Response(
+            generate(),
+            mimetype='audio/wav',
+            headers={'Content-Disposition': 'attachment; filename=tts_output.wav'}
+        )
+        # Long texts stream for longer than Quart's default response
+        # timeout, which would silently truncate the body
+        response.timeout = None
+        return response
+        
+    except HTTPException as e:
+        # Raised by request.get_json() for malformed or non-JSON bodies
+        return jsonify({"error": e.description}), e.code
+    except Exception as e:
+        logging.error(f"Error in pipelined TTS processing: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/voices', methods=['GET'])
-def list_voices():
+async def list_voices():
     """List available voice names"""
-    # Common Google TTS voices
-    voices = [
-        "Kore", "Puck", "Charon", "Krypton", "Fenrir",
-        "Aoede", "Orpheus", "Pegasus", "Sage", "Tamara"
-    ]
-    return jsonify({"available_voices": voices})
+    return Response(
+        VOICES_RESPONSE,
+        mimetype='application/json',
+        headers={'Cache-Control': 'public, max-age=3600'}
+    )
 
 if __name__ == '__main__':
+    # Development server only; the container runs the app under uvicorn
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -64,7 +64,26 @@ def chunked_tts():
     else:
         print(f"Error: {response.json()}")
 
-# Example 4: Get available voices
+# Example 4: Stream a long text sentence by sentence
+def pipelined_tts():
+    """Stream a long text, starting playback after the first sentence"""
+    payload = {
+        "text": "This is the first sentence. Here comes the second one! "
+                "Did you hear the third? And this is the last sentence."
+    }
+    
+    response = requests.post(f"{BASE_URL}/tts/pipeline", json=payload, stream=True)
+    
+    if response.status_code == 200:
+        # Write the audio as it arrives
+        with open("pipeline_output.wav", "wb") as f:
+            for data in response.iter_content(chunk_size=None):
+                f.write(data)
+        print("Audio saved as pipeline_output.wav")
+    else:
+        print(f"Error: {response.json()}")
+
+# Example 5: Get available voices
 def get_voices():
     """Get list of available voices"""
     response = requests.get(f"{BASE_URL}/voices")
@@ -85,5 +104,8 @@ if __name__ == "__main__":
     print("\n3. Chunked text processing:")
     chunked_tts()
     
-    print("\n4. Available voices:")
+    print("\n4. Pipelined TTS streaming:")
+    pipelined_tts()
+    
+    print("\n5. Available voices:")
     get_voices()